@@ -2,8 +2,8 @@ if __name__ == "__main__":
     with open("src/fastq_filter/score_to_error_rate.h", "wt") as output:
         output.write("// An array holding all error rates for each phred score.\n")
         output.write("// This file was automatically generated.\n\n")
-        output.write("static const double SCORE_TO_ERROR_RATE[128] = {\n")
-        for i in range(128):
+        output.write("static const double SCORE_TO_ERROR_RATE[256] = {\n")
+        for i in range(256):
             error_rate = 10 ** -(i/10)
             output.write(f"    {str(error_rate).upper() + 'L,':24}  // {i}\n")
         output.write("};\n")
@@ -20,8 +20,11 @@
 import argparse
 import contextlib
 import functools
+import itertools
 import logging
-from typing import Callable, Iterable, Iterator, List, Tuple
+import operator
+import os
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Tuple
 
 import dnaio
 
@@ -29,6 +32,7 @@ import xopen  # type: ignore
 
 from ._filters import (
     AverageErrorRateFilter,
+    CombinedFilter,
     DEFAULT_PHRED_SCORE_OFFSET,
     MaximumLengthFilter,
     MedianQualityFilter,
@@ -45,6 +49,7 @@ __all__ = [
     "fastq_records_to_file",
     "filter_fastq",
     "AverageErrorRateFilter",
+    "CombinedFilter",
     "MaximumLengthFilter",
     "MedianQualityFilter",
     "MinimumLengthFilter",
@@ -54,27 +59,68 @@ __all__ = [
     "DEFAULT_PHRED_SCORE_OFFSET"
 ]
 
-DEFAULT_COMPRESSION_LEVEL = 2
+DEFAULT_COMPRESSION_LEVEL = 1
+# Number of records that are collected before they are written to the
+# outputs. The records of a batch are joined and written in a single call.
+WRITE_BATCH_SIZE = 1000
+# Number of threads used for (de)compression. With zero threads, compression
+# happens in the main process, otherwise an external program such as pigz or
+# igzip is used.
+DEFAULT_THREADS = min(4, os.cpu_count() or 1)
 
+# Filters implemented in C. These accept single records as well as tuples of
+# records and can be combined into a single CombinedFilter.
+_C_FILTERS = (AverageErrorRateFilter, MedianQualityFilter,
+              MinimumLengthFilter, MaximumLengthFilter)
+# Relative cost of the C filters. Cheap filters are applied first, so the
+# expensive ones only need to evaluate the records that pass.
+_FILTER_COST = {
+    MinimumLengthFilter: 0,
+    MaximumLengthFilter: 0,
+    AverageErrorRateFilter: 1,
+    MedianQualityFilter: 2,
+}
 
-def file_to_fastq_records(filepath: str) -> Iterator[dnaio.Sequence]:
+
+def _write_records(record_tuples: Iterable[Tuple[dnaio.SequenceRecord, ...]],
+                   outputs: List[BinaryIO]):
+    """
+    Write each tuple of records to the outputs, one record per output.
+    The records are written in batches of WRITE_BATCH_SIZE to reduce the
+    number of write calls.
+    """
+    writes = [output.write for output in outputs]
+    getters = [operator.itemgetter(i) for i in range(len(outputs))]
+    fastq_bytes = operator.methodcaller("fastq_bytes")
+    record_tuples = iter(record_tuples)
+    while True:
+        batch = list(itertools.islice(record_tuples, WRITE_BATCH_SIZE))
+        if not batch:
+            break
+        for getter, write in zip(getters, writes):
+            write(b"".join(map(fastq_bytes, map(getter, batch))))
+
+
+def file_to_fastq_records(filepath: str, threads: int = DEFAULT_THREADS
+                          ) -> Iterator[dnaio.Sequence]:
     """Parse a FASTQ file into a generator of Sequence objects"""
-    opener = functools.partial(xopen.xopen, threads=0)
+    opener = functools.partial(xopen.xopen, threads=threads)
     with dnaio.open(filepath, opener=opener) as record_h:  # type: ignore
         yield from record_h
 
 
 def fastq_records_to_file(records: Iterable[dnaio.Sequence], filepath: str,
-                          compression_level: int = DEFAULT_COMPRESSION_LEVEL):
-    with xopen.xopen(filepath, mode='wb', threads=0,
+                          compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                          threads: int = DEFAULT_THREADS):
+    with xopen.xopen(filepath, mode='wb', threads=threads,
                      compresslevel=compression_level) as output_h:
-        for record in records:
-            output_h.write(record.fastq_bytes())
+        _write_records(zip(records), [output_h])
 
 
 def multiple_files_to_records(input_files: List[str],
+                              threads: int = DEFAULT_THREADS,
                               ) -> Iterator[Tuple[dnaio.SequenceRecord, ...]]:
-    readers = [file_to_fastq_records(f) for f in input_files]
+    readers = [file_to_fastq_records(f, threads) for f in input_files]
     iterators = [iter(reader) for reader in readers]
 
     # By differentiating between single, paired and multiple files we can
@@ -110,53 +156,52 @@ def multiple_files_to_records(input_files: List[str],
 
 def filter_fastq(input_files: List[str], output_files: List[str],
                  filters: List[Callable[[Tuple[dnaio.SequenceRecord, ...]], bool]],
-                 compression_level: int = DEFAULT_COMPRESSION_LEVEL):
+                 compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                 threads: int = DEFAULT_THREADS):
     """
     Filter FASTQ input files with the filters in filters and write
     the results to the output file.
 
-    :param filters: Functions that filter a tuple of dnaio.sequence records
+    :param filters: Functions that filter a tuple of dnaio.sequence records.
+    When all filters are fastq_filter filters, they are applied from
+    cheapest to most expensive rather than in the given order.
     :param input_files: FASTQ input filenames. Compressed files are handled
     automatically.
     :param output_files: FASTQ output filenames. Compressed files are handled
     automatically.
     :param compression_level: Compression level for the output files (if
     applicable)
+    :param threads: Number of threads used for compression and decompression
+    of each file. Use 0 to (de)compress in the main process.
     """
     if len(input_files) != len(output_files):
         raise ValueError("Number of inputs and outputs should be equal.")
-    filtered_fastq_records = multiple_files_to_records(input_files)
+    c_filters_only = all(isinstance(filter_func, _C_FILTERS)
+                         for filter_func in filters)
+    if c_filters_only and len(filters) > 1:
+        # Apply all filters in one call rather than a chain of filter calls.
+        filters = sorted(filters, key=lambda f: _FILTER_COST[type(f)])
+        filters = [CombinedFilter(filters)]  # type: ignore
+    # Single end records do not need to be wrapped in a tuple when the
+    # filters can handle single records.
+    single_records = c_filters_only and len(input_files) == 1
+    filtered_fastq_records: Iterator[Any] = (
+        file_to_fastq_records(input_files[0], threads) if single_records
+        else multiple_files_to_records(input_files, threads))
     for filter_func in filters:
         filtered_fastq_records = filter(filter_func, filtered_fastq_records)
+
+    def open_output(output_file: str) -> BinaryIO:
+        return xopen.xopen(output_file, mode="wb", threads=threads,
+                           compresslevel=compression_level)
+
+    if single_records:
+        # The writer expects a tuple of records for each output.
+        filtered_fastq_records = zip(filtered_fastq_records)
     with contextlib.ExitStack() as output_stack:
-        outputs = [output_stack.enter_context(
-                   xopen.xopen(output_file, threads=0, mode="wb",
-                               compresslevel=compression_level))
+        outputs = [output_stack.enter_context(open_output(output_file))
                    for output_file in output_files]
-        # Use faster methods for more common cases before falling back to
-        # generic multiple files mode (which is slower).
-        if len(outputs) == 1:
-            output = outputs[0]
-            for record, in filtered_fastq_records:
-                output.write(record.fastq_bytes())
-        elif len(outputs) == 2:
-            output1 = outputs[0]
-            output2 = outputs[1]
-            for record1, record2 in filtered_fastq_records:
-                output1.write(record1.fastq_bytes())
-                output2.write(record2.fastq_bytes())
-        elif len(outputs) == 3:
-            output1 = outputs[0]
-            output2 = outputs[1]
-            output3 = outputs[2]
-            for record1, record2, record3 in filtered_fastq_records:
-                output1.write(record1.fastq_bytes())
-                output2.write(record2.fastq_bytes())
-                output3.write(record3.fastq_bytes())
-        else:  # More than 3 files is quite uncommon.
-            for records in filtered_fastq_records:
-                for record, output in zip(records, outputs):
-                    output.write(record.fastq_bytes())
+        _write_records(filtered_fastq_records, outputs)
 
 
 def initiate_logger(verbose: int = 0, quiet: int = 0):
@@ -202,9 +247,15 @@ def argument_parser() -> argparse.ArgumentParser:
     parser.add_argument("-c", "--compression-level", type=int,
                         default=DEFAULT_COMPRESSION_LEVEL,
                         help=f"Compression level for the output files. "
-                             f"Relevant when output files have a .gz "
+                             f"Relevant when output files have a .gz or .zst "
                              f"extension. Default: {DEFAULT_COMPRESSION_LEVEL}"
                         )
+    parser.add_argument("-t", "--threads", type=int, default=DEFAULT_THREADS,
+                        help="Number of threads used for compression and "
+                             "decompression of each file. Use 0 to "
+                             "(de)compress without external programs. "
+                             "Default: up to 4, limited by the number of "
+                             "CPUs")
     parser.add_argument("--verbose", action="count", default=0,
                         help="Report stats on individual filters.")
     parser.add_argument("--quiet", action="count", default=0,
@@ -242,7 +293,8 @@ def main():
     filter_fastq(filters=filters,
                  input_files=args.input,
                  output_files=output,
-                 compression_level=args.compression_level)
+                 compression_level=args.compression_level,
+                 threads=args.threads)
 
     if filters:
         total = filters[0].total
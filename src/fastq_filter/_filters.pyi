@@ -18,12 +18,14 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Tuple, Union
+from typing import Iterable, Tuple, Union
 
 from dnaio import SequenceRecord
 
 DEFAULT_PHRED_SCORE_OFFSET: int = ...
 
+_PhredScores = Union[str, bytes, bytearray, memoryview]
+
 class _Filter:
     threshold: Union[int, float]
     passed: int
@@ -32,7 +34,9 @@ class _Filter:
 
     def __init__(self): ...
 
-    def __call__(self, __records: Tuple[SequenceRecord, ...]) -> bool: ...
+    def __call__(self, __records: Union[SequenceRecord,
+                                        Tuple[SequenceRecord, ...]]
+                 ) -> bool: ...
 
 class _QualityFilter(_Filter):
     phred_offset: int
@@ -50,9 +54,23 @@ class MedianQualityFilter(_QualityFilter): ...
 class MinimumLengthFilter(_LengthFilter): ...
 class MaximumLengthFilter(_LengthFilter): ...
 
-def qualmean(phred_scores: str, phred_offset: int = DEFAULT_PHRED_SCORE_OFFSET): ...
+class CombinedFilter:
+    filters: Tuple[_Filter, ...]
+    passed: int
+    total: int
+    name: str
+
+    def __init__(self, filters: Iterable[_Filter]): ...
+
+    def __call__(self, __records: Union[SequenceRecord,
+                                        Tuple[SequenceRecord, ...]]
+                 ) -> bool: ...
+
+def qualmean(phred_scores: _PhredScores,
+             phred_offset: int = DEFAULT_PHRED_SCORE_OFFSET): ...
 
-def qualmedian(phred_scores: str, phred_offset: int = DEFAULT_PHRED_SCORE_OFFSET): ...
+def qualmedian(phred_scores: _PhredScores,
+               phred_offset: int = DEFAULT_PHRED_SCORE_OFFSET): ...
 
-def average_error_rate(phred_scores: str,
+def average_error_rate(phred_scores: _PhredScores,
                        phred_offset: int = DEFAULT_PHRED_SCORE_OFFSET): ...
@@ -27,27 +27,139 @@
 #include "score_to_error_rate.h"
 #define MAXIMUM_PHRED_SCORE 126
 #define DEFAULT_PHRED_SCORE_OFFSET 33
+// Releasing and reacquiring the GIL has a cost, so it is only released
+// for phred score arrays of at least this length.
+#define GIL_RELEASE_THRESHOLD 4096
 
 
-static inline double 
-sum_error_rate(const uint8_t *phred_scores, size_t phred_length, uint8_t phred_offset) {
-    double total_error_rate = 0.0;
-    uint8_t score;
+static void
+raise_phred_range_error(const uint8_t *phred_scores, size_t phred_length, uint8_t phred_offset)
+{
     uint8_t max_score = MAXIMUM_PHRED_SCORE - phred_offset;
     for (size_t i=0; i<phred_length; i+=1) {
-        score = phred_scores[i] - phred_offset;
-        if (score > max_score) {
+        if ((uint8_t)(phred_scores[i] - phred_offset) > max_score) {
             PyErr_Format(
                 PyExc_ValueError,
                 "Character %c outside of valid phred range ('%c' to '%c')",
                 phred_scores[i], phred_offset, MAXIMUM_PHRED_SCORE);
-            return -1.0L;
+            return;
         }
-        total_error_rate += SCORE_TO_ERROR_RATE[score];
+    }
+}
+
+/**
+ * @brief Returns the sum of the error rates of an array of phred scores.
+ * Does not use the Python C-API, so it can be called without holding the GIL.
+ *
+ * @return double The sum of the error rates, or -1.0L when a phred score is
+ *                outside of the valid range. No exception is set in that
+ *                case, use raise_phred_range_error.
+ */
+static inline double
+sum_error_rate(const uint8_t *phred_scores, size_t phred_length, uint8_t phred_offset) {
+    uint8_t score0, score1, score2, score3;
+    uint8_t max_score = MAXIMUM_PHRED_SCORE - phred_offset;
+    // SCORE_TO_ERROR_RATE has an entry for every uint8_t value, so out of
+    // range scores can be looked up safely. The range check is only evaluated
+    // after the loop, which keeps the loop free of branches.
+    int out_of_range = 0;
+    // Floating point additions have a latency of several cycles. Using four
+    // independent accumulators allows the additions to be pipelined.
+    double sum0 = 0.0, sum1 = 0.0, sum2 = 0.0, sum3 = 0.0;
+    size_t i = 0;
+    size_t unrolled_length = phred_length - (phred_length % 4);
+    for (; i < unrolled_length; i+=4) {
+        score0 = phred_scores[i] - phred_offset;
+        score1 = phred_scores[i + 1] - phred_offset;
+        score2 = phred_scores[i + 2] - phred_offset;
+        score3 = phred_scores[i + 3] - phred_offset;
+        out_of_range |= (score0 > max_score) | (score1 > max_score) |
+                        (score2 > max_score) | (score3 > max_score);
+        sum0 += SCORE_TO_ERROR_RATE[score0];
+        sum1 += SCORE_TO_ERROR_RATE[score1];
+        sum2 += SCORE_TO_ERROR_RATE[score2];
+        sum3 += SCORE_TO_ERROR_RATE[score3];
+    }
+    for (; i < phred_length; i+=1) {
+        score0 = phred_scores[i] - phred_offset;
+        out_of_range |= score0 > max_score;
+        sum0 += SCORE_TO_ERROR_RATE[score0];
+    }
+    double total_error_rate = (sum0 + sum1) + (sum2 + sum3);
+    if (out_of_range) {
+        return -1.0L;
     }
     return total_error_rate;
 }
 
+// Checking whether the records can still pass requires combining the
+// accumulators, which stalls the summation. It is therefore only done once
+// every block, and only for records spanning more than two blocks.
+#define ERROR_RATE_BLOCK_SIZE 256
+
+/**
+ * @brief Like sum_error_rate, but stops summing once the records can no
+ * longer pass. After every block of ERROR_RATE_BLOCK_SIZE phred scores it is
+ * checked whether (previous_error_sum + error_sum) / total_length exceeds
+ * max_error_rate. If so, the remaining phred scores are only checked for
+ * validity. The accumulators never decrease, so the complete sum would
+ * exceed max_error_rate as well.
+ *
+ * @return double The (partial) sum of the error rates, or -1.0L when a
+ *                phred score is outside of the valid range. No exception is
+ *                set in that case, use raise_phred_range_error.
+ */
+static inline double
+sum_error_rate_bounded(const uint8_t *phred_scores, size_t phred_length,
+                       uint8_t phred_offset, double previous_error_sum,
+                       double total_length, double max_error_rate)
+{
+    uint8_t score0, score1, score2, score3;
+    uint8_t max_score = MAXIMUM_PHRED_SCORE - phred_offset;
+    int out_of_range = 0;
+    double sum0 = 0.0, sum1 = 0.0, sum2 = 0.0, sum3 = 0.0;
+    size_t i = 0;
+    size_t unrolled_length = phred_length - (phred_length % 4);
+    while (i < unrolled_length) {
+        size_t block_end = i + ERROR_RATE_BLOCK_SIZE;
+        if (block_end > unrolled_length) {
+            block_end = unrolled_length;
+        }
+        for (; i < block_end; i+=4) {
+            score0 = phred_scores[i] - phred_offset;
+            score1 = phred_scores[i + 1] - phred_offset;
+            score2 = phred_scores[i + 2] - phred_offset;
+            score3 = phred_scores[i + 3] - phred_offset;
+            out_of_range |= (score0 > max_score) | (score1 > max_score) |
+                            (score2 > max_score) | (score3 > max_score);
+            sum0 += SCORE_TO_ERROR_RATE[score0];
+            sum1 += SCORE_TO_ERROR_RATE[score1];
+            sum2 += SCORE_TO_ERROR_RATE[score2];
+            sum3 += SCORE_TO_ERROR_RATE[score3];
+        }
+        if (i == unrolled_length) {
+            break;
+        }
+        double error_sum = (sum0 + sum1) + (sum2 + sum3);
+        if ((previous_error_sum + error_sum) / total_length > max_error_rate) {
+            for (; i < phred_length; i+=1) {
+                score0 = phred_scores[i] - phred_offset;
+                out_of_range |= score0 > max_score;
+            }
+            return out_of_range ? -1.0L : error_sum;
+        }
+    }
+    for (; i < phred_length; i+=1) {
+        score0 = phred_scores[i] - phred_offset;
+        out_of_range |= score0 > max_score;
+        sum0 += SCORE_TO_ERROR_RATE[score0];
+    }
+    if (out_of_range) {
+        return -1.0L;
+    }
+    return (sum0 + sum1) + (sum2 + sum3);
+}
+
 /**
  * @brief Returns the average error rate based on an array of phred scores. 
  * 
@@ -59,29 +171,83 @@ sum_error_rate(const uint8_t *phred_scores, size_t phred_length, uint8_t phred_o
 static inline double 
 average_error_rate(const uint8_t *phred_scores, size_t phred_length, uint8_t phred_offset)
 {
-    double total_error_rate = sum_error_rate(phred_scores, phred_length, phred_offset);
+    double total_error_rate;
+    if (phred_length < GIL_RELEASE_THRESHOLD) {
+        total_error_rate = sum_error_rate(phred_scores, phred_length, phred_offset);
+    } else {
+        Py_BEGIN_ALLOW_THREADS
+        total_error_rate = sum_error_rate(phred_scores, phred_length, phred_offset);
+        Py_END_ALLOW_THREADS
+    }
     if (total_error_rate < 0.0) {
+        raise_phred_range_error(phred_scores, phred_length, phred_offset);
         return -1.0L;
     }
     return total_error_rate / (double)phred_length;
 }
 
+// Inputs of at least this length are counted into four interleaved
+// histograms, which are merged every HISTOGRAM_BLOCK_SIZE scores so that
+// their 32-bit counts cannot overflow.
+#define INTERLEAVED_HISTOGRAM_THRESHOLD 1024
+#define HISTOGRAM_BLOCK_SIZE ((size_t)1 << 30)
+
+/**
+ * @brief Adds the phred scores to the histogram. Does not use the Python
+ * C-API, so it can be called without holding the GIL.
+ *
+ * @param histogram A histogram with 128 bins.
+ * @return int 0 on success, -1 when a phred score is outside of the valid
+ *             range. No exception is set in that case, use
+ *             raise_phred_range_error.
+ */
 static inline int 
 make_histogram(size_t *histogram, const uint8_t *phred_scores, size_t phred_length, uint8_t phred_offset) 
 {
-    uint8_t score;
+    uint8_t score0, score1, score2, score3;
     uint8_t max_score = MAXIMUM_PHRED_SCORE - phred_offset;
-
-    for (size_t i=0; i < phred_length; i+= 1) {
-        score = phred_scores[i] - phred_offset;
-        if (score > max_score) {
-            PyErr_Format(
-                PyExc_ValueError,
-                "Character %c outside of valid phred range ('%c' to '%c')",
-                phred_scores[i], phred_offset, MAXIMUM_PHRED_SCORE);
-            return -1;
+    // Out of range scores are masked into the histogram rather than
+    // branching on every score. The histogram is invalid in that case, but
+    // an error is returned anyway.
+    int out_of_range = 0;
+    size_t i = 0;
+    if (phred_length >= INTERLEAVED_HISTOGRAM_THRESHOLD) {
+        // Runs of identical scores are common, especially with binned
+        // qualities. Each increment of a bin has to wait for the previous
+        // one, so the counting is spread over four histograms.
+        uint32_t counts[4][128];
+        size_t unrolled_length = phred_length - (phred_length % 4);
+        while (i < unrolled_length) {
+            size_t block_end = i + HISTOGRAM_BLOCK_SIZE;
+            if (block_end > unrolled_length) {
+                block_end = unrolled_length;
+            }
+            memset(counts, 0, sizeof(counts));
+            for (; i < block_end; i+=4) {
+                score0 = phred_scores[i] - phred_offset;
+                score1 = phred_scores[i + 1] - phred_offset;
+                score2 = phred_scores[i + 2] - phred_offset;
+                score3 = phred_scores[i + 3] - phred_offset;
+                out_of_range |= (score0 > max_score) | (score1 > max_score) |
+                                (score2 > max_score) | (score3 > max_score);
+                counts[0][score0 & 127] += 1;
+                counts[1][score1 & 127] += 1;
+                counts[2][score2 & 127] += 1;
+                counts[3][score3 & 127] += 1;
+            }
+            for (size_t j=0; j < 128; j+=1) {
+                histogram[j] += (size_t)counts[0][j] + (size_t)counts[1][j] +
+                                (size_t)counts[2][j] + (size_t)counts[3][j];
+            }
         }
-        histogram[score] += 1;
+    }
+    for (; i < phred_length; i+=1) {
+        score0 = phred_scores[i] - phred_offset;
+        out_of_range |= score0 > max_score;
+        histogram[score0 & 127] += 1;
+    }
+    if (out_of_range) {
+        return -1;
     }
     return 0;
 }
@@ -108,7 +274,7 @@ median_from_histogram(size_t *histogram, size_t phred_length, uint8_t phred_offs
                 // The two middle values were the same
                 return (double)i;
             } 
-            for (uint8_t j=i+1; j<max_score; j+=1) {
+            for (uint8_t j=i+1; j<=max_score; j+=1) {
                 if (histogram[j] > 0) {
                     return (double)(i + j) / 2.0L;
                 }
@@ -137,13 +303,58 @@ qualmedian(const uint8_t *phred_scores, size_t phred_length, uint8_t phred_offse
     }
     size_t histogram[128];
     memset(histogram, 0, 128 * sizeof(size_t));
-    int ret = make_histogram(histogram, phred_scores, phred_length, phred_offset);
+    int ret;
+    if (phred_length < GIL_RELEASE_THRESHOLD) {
+        ret = make_histogram(histogram, phred_scores, phred_length, phred_offset);
+    } else {
+        Py_BEGIN_ALLOW_THREADS
+        ret = make_histogram(histogram, phred_scores, phred_length, phred_offset);
+        Py_END_ALLOW_THREADS
+    }
     if (ret != 0) {
+        raise_phred_range_error(phred_scores, phred_length, phred_offset);
         return -1.0L;
     }
     return median_from_histogram(histogram, phred_length, phred_offset);
 }
 
+/**
+ * @brief Get a buffer with the phred scores from an ASCII string or a
+ * bytes-like object. The buffer must be released with PyBuffer_Release.
+ *
+ * @param phred_scores An ASCII string or an object supporting the buffer
+ *                     protocol.
+ * @param view The buffer to fill.
+ * @return int 0 on success, -1 on error.
+ */
+static int
+phred_scores_get_buffer(PyObject *phred_scores, Py_buffer *view)
+{
+    if (PyUnicode_Check(phred_scores)) {
+        if (!PyUnicode_IS_COMPACT_ASCII(phred_scores)) {
+            PyErr_SetString(PyExc_ValueError,
+                            "phred_scores must be ASCII encoded.");
+            return -1;
+        }
+        return PyBuffer_FillInfo(view, phred_scores,
+                                 PyUnicode_DATA(phred_scores),
+                                 PyUnicode_GET_LENGTH(phred_scores),
+                                 1, PyBUF_SIMPLE);
+    }
+    if (PyObject_GetBuffer(phred_scores, view,
+                           PyBUF_ND | PyBUF_FORMAT) < 0) {
+        return -1;
+    }
+    if (view->itemsize != 1) {
+        PyErr_Format(PyExc_TypeError,
+                     "phred_scores must be a buffer of single bytes, "
+                     "got a buffer with item size %zd.", view->itemsize);
+        PyBuffer_Release(view);
+        return -1;
+    }
+    return 0;
+}
+
 PyDoc_STRVAR(qualmean__doc__,
 "qualmean($self, phred_scores, /, phred_offset=DEFAULT_PHRED_SCORE_OFFSET)\n"
 "--\n"
@@ -151,7 +362,7 @@ PyDoc_STRVAR(qualmean__doc__,
 "Returns the mean quality score. \n"
 "\n"
 "  phred_scores\n"
-"    ASCII string with the phred scores.\n"
+"    ASCII string or bytes-like object with the phred scores.\n"
 );
 
 #define QUALMEAN_METHODDEF    \
@@ -164,23 +375,19 @@ qualmean(PyObject *module, PyObject *args, PyObject *kwargs)
     PyObject *phred_scores = NULL;
     uint8_t phred_offset = DEFAULT_PHRED_SCORE_OFFSET;
     char *kwarg_names[] = {"", "phred_offset", NULL};
-    const char *format = "O!|b:qualmean";
+    const char *format = "O|b:qualmean";
     if (!PyArg_ParseTupleAndKeywords(
         args, kwargs, format, kwarg_names,
-        &PyUnicode_Type,
         &phred_scores,
         &phred_offset)) {
             return NULL;
     }
-
-    if (!PyUnicode_IS_COMPACT_ASCII(phred_scores)) {
-        PyErr_SetString(PyExc_ValueError,
-                        "phred_scores must be ASCII encoded.");
+    Py_buffer view;
+    if (phred_scores_get_buffer(phred_scores, &view) < 0) {
         return NULL;
     }
-    uint8_t *phreds = PyUnicode_DATA(phred_scores);
-    size_t phred_length = PyUnicode_GET_LENGTH(phred_scores);
-    double error_rate = average_error_rate(phreds, phred_length, phred_offset);
+    double error_rate = average_error_rate(view.buf, view.len, phred_offset);
+    PyBuffer_Release(&view);
     if (error_rate < 0.0L) {
         return NULL;
     }
@@ -196,7 +403,7 @@ PyDoc_STRVAR(average_error_rate__doc__,
 "Returns the average_error_rate. \n"
 "\n"
 "  phred_scores\n"
-"    ASCII string with the phred scores.\n"
+"    ASCII string or bytes-like object with the phred scores.\n"
 );
 
 #define AVERAGE_ERROR_RATE_METHODDEF    \
@@ -209,23 +416,19 @@ average_error_rate_py(PyObject *module, PyObject *args, PyObject *kwargs)
     PyObject *phred_scores = NULL;
     uint8_t phred_offset = DEFAULT_PHRED_SCORE_OFFSET;
     char *kwarg_names[] = {"", "phred_offset", NULL};
-    const char *format = "O!|b:average_error_rate";
+    const char *format = "O|b:average_error_rate";
     if (!PyArg_ParseTupleAndKeywords(
         args, kwargs, format, kwarg_names,
-        &PyUnicode_Type,
         &phred_scores,
         &phred_offset)) {
             return NULL;
     }
-
-    if (!PyUnicode_IS_COMPACT_ASCII(phred_scores)) {
-        PyErr_SetString(PyExc_ValueError,
-                        "phred_scores must be ASCII encoded.");
+    Py_buffer view;
+    if (phred_scores_get_buffer(phred_scores, &view) < 0) {
         return NULL;
     }
-    uint8_t *phreds = PyUnicode_DATA(phred_scores);
-    size_t phred_length = PyUnicode_GET_LENGTH(phred_scores);
-    double error_rate = average_error_rate(phreds, phred_length, phred_offset);
+    double error_rate = average_error_rate(view.buf, view.len, phred_offset);
+    PyBuffer_Release(&view);
     if (error_rate < 0.0L) {
         return NULL;
     }
@@ -239,7 +442,7 @@ PyDoc_STRVAR(qualmedian__doc__,
 "Returns the median quality score. \n"
 "\n"
 "  phred_scores\n"
-"    ASCII string with the phred scores.\n"
+"    ASCII string or bytes-like object with the phred scores.\n"
 );
 
 #define QUALMEDIAN_METHODDEF    \
@@ -252,23 +455,19 @@ qualmedian_py(PyObject *module, PyObject *args, PyObject *kwargs)
     PyObject *phred_scores = NULL;
     uint8_t phred_offset = DEFAULT_PHRED_SCORE_OFFSET;
     char *kwarg_names[] = {"", "phred_offset", NULL};
-    const char *format = "O!|b:qualmedian";
+    const char *format = "O|b:qualmedian";
     if (!PyArg_ParseTupleAndKeywords(
         args, kwargs, format, kwarg_names,
-        &PyUnicode_Type,
         &phred_scores,
         &phred_offset)) {
             return NULL;
     }
-
-    if (!PyUnicode_IS_COMPACT_ASCII(phred_scores)) {
-        PyErr_SetString(PyExc_ValueError,
-                        "phred_scores must be ASCII encoded.");
+    Py_buffer view;
+    if (phred_scores_get_buffer(phred_scores, &view) < 0) {
         return NULL;
     }
-    uint8_t *phreds = PyUnicode_DATA(phred_scores);
-    size_t phred_length = PyUnicode_GET_LENGTH(phred_scores);
-    double median = qualmedian(phreds, phred_length, phred_offset);
+    double median = qualmedian(view.buf, view.len, phred_offset);
+    PyBuffer_Release(&view);
     if (median < 0.0) {
         return NULL;
     }
@@ -399,29 +598,44 @@ GenericLengthFilter__new__(PyTypeObject *type, PyObject *args, PyObject *kwargs)
     return (PyObject *)self;
 }
 
-static PyObject *
-GenericFilter_ParseArgsToRecordTuple(PyObject *args, 
-                                     PyObject *kwargs, 
-                                     PyTypeObject *sequence_record_class) 
+/**
+ * @brief Get the records from the arguments of a filter call. The argument
+ * can be a single dnaio.SequenceRecord or a tuple of dnaio.SequenceRecords.
+ *
+ * @param records Is set to point at the array of records.
+ * @return Py_ssize_t The number of records, or -1 on error.
+ */
+static Py_ssize_t
+GenericFilter_ParseArgsToRecords(PyObject *args,
+                                 PyObject *kwargs,
+                                 PyTypeObject *sequence_record_class,
+                                 PyObject ***records)
 {
     if (kwargs != NULL) {
         PyErr_Format(PyExc_TypeError, 
                      "filter takes exactly 0 keyword arguments, got %d",
                      PyDict_GET_SIZE(kwargs));
-        return NULL;
+        return -1;
     }
     if (PyTuple_GET_SIZE(args) != 1) {
         PyErr_Format(PyExc_TypeError, 
                      "filter takes exactly 1 positional argument, got %d",
                      PyTuple_GET_SIZE(args));
-        return NULL;
+        return -1;
     }
     PyObject *arg = PyTuple_GET_ITEM(args, 0);
+    if (Py_TYPE(arg) == sequence_record_class) {
+        // A single record is used as is, which saves creating a tuple for
+        // the common single end case.
+        *records = &PyTuple_GET_ITEM(args, 0);
+        return 1;
+    }
     if (!PyTuple_CheckExact(arg)) {
         PyErr_Format(PyExc_TypeError, 
-                     "filter argument must be a tuple, got %s",
+                     "filter argument must be a tuple or a "
+                     "dnaio.SequenceRecord, got %s",
                      Py_TYPE(arg)->tp_name);
-        return NULL;
+        return -1;
     }
     Py_ssize_t record_tuple_length = PyTuple_GET_SIZE(arg);
     PyObject *record;
@@ -432,169 +646,210 @@ GenericFilter_ParseArgsToRecordTuple(PyObject *args,
                 PyExc_TypeError, 
                 "All records must be of type dnaio.SequenceRecord, "
                 "got %s at index %zd", 
-                Py_TYPE(arg)->tp_name, i);
-        return NULL;
+                Py_TYPE(record)->tp_name, i);
+        return -1;
         }
     }
-    return arg;
+    *records = &PyTuple_GET_ITEM(arg, 0);
+    return record_tuple_length;
 }
 
-static PyObject *
-AverageErrorRateFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs) 
+/**
+ * @brief Signature of the functions that check whether an array of records
+ * passes a filter. These do not update the counters of the filter.
+ *
+ * @return 1 if the records pass, 0 if they do not and -1 on error.
+ */
+typedef int (*filter_function)(FastqFilter *self, PyObject **records,
+                               Py_ssize_t number_of_records);
+
+/**
+ * @brief Get the phred scores from a SequenceRecord.
+ *
+ * @return PyObject* A new reference to the phred scores string, or NULL with
+ *                   an exception set on error.
+ */
+static inline PyObject *
+FastqFilter_GetPhredScores(FastqFilter *self, PyObject *record)
 {
-    PyObject *record_tuple = GenericFilter_ParseArgsToRecordTuple(
-        args, kwargs, self->sequence_record_class);
-    if (record_tuple == NULL) {
+    PyObject *phred_scores = PyObject_GetAttr(record, self->sequence_record_atrr);
+    if (phred_scores == NULL) {
         return NULL;
     }
-    PyObject *record;
+    if (phred_scores == Py_None) {
+        Py_DECREF(phred_scores);
+        PyObject *name = PyObject_GetAttrString(record, "name");
+        if (name == NULL) {
+            return NULL;
+        }
+        PyErr_Format(
+            PyExc_ValueError,
+            "SequenceRecord object with name %R does not have quality scores "
+            "(FASTA record)", name
+        );
+        Py_DECREF(name);
+        return NULL;
+    }
+    return phred_scores;
+}
+
+static int
+AverageErrorRateFilter_passes(FastqFilter *self, PyObject **records,
+                              Py_ssize_t number_of_records)
+{
     PyObject *phred_scores;
     uint8_t *phreds;
     Py_ssize_t phred_length;
     uint8_t phred_offset = self->phred_offset;
+    double max_error_rate = self->threshold_d;
     double total_error_sum = 0.0;
     size_t length_sum = 0;
-    Py_ssize_t record_tuple_length = PyTuple_GET_SIZE(record_tuple);
-    for (Py_ssize_t i=0; i < record_tuple_length; i++) {
-        record = PyTuple_GET_ITEM(record_tuple, i);
-        phred_scores = PyObject_GetAttr(record, self->sequence_record_atrr);
+    Py_ssize_t last = number_of_records - 1;
+    for (Py_ssize_t i=0; i < number_of_records; i++) {
+        phred_scores = FastqFilter_GetPhredScores(self, records[i]);
         if (phred_scores == NULL) {
-            return NULL;
-        }
-        if (phred_scores == Py_None) {
-            PyErr_Format(
-                PyExc_ValueError,
-                "SequenceRecord object with name %R does not have quality scores "
-                "(FASTA record)", PyObject_GetAttrString(record, "name")
-            );
-            Py_DECREF(phred_scores);
-            return NULL;
+            return -1;
         }
         phreds = PyUnicode_DATA(phred_scores);
         phred_length = PyUnicode_GET_LENGTH(phred_scores);
-        double error_sum = sum_error_rate(phreds, phred_length, phred_offset);
-        Py_DECREF(phred_scores);
+        length_sum += phred_length;
+        double error_sum;
+        if (i == last && phred_length > 2 * ERROR_RATE_BLOCK_SIZE) {
+            // The total length is known for the last record, so the
+            // summation can stop as soon as the records are certain to fail.
+            error_sum = sum_error_rate_bounded(
+                phreds, phred_length, phred_offset, total_error_sum,
+                (double)length_sum, max_error_rate);
+        } else {
+            error_sum = sum_error_rate(phreds, phred_length, phred_offset);
+        }
         if (error_sum < 0) {
-            return NULL; 
+            raise_phred_range_error(phreds, phred_length, phred_offset);
+            Py_DECREF(phred_scores);
+            return -1;
         }
+        Py_DECREF(phred_scores);
         total_error_sum += error_sum;
-        length_sum += phred_length;
     }
     double error_rate = total_error_sum / (double)length_sum;
-    self->total += 1;
-    int pass = error_rate <= self->threshold_d;
-    if (pass) {
-        self->pass += 1;
-    }
-    return PyBool_FromLong(pass);
+    return error_rate <= max_error_rate;
 }
 
-static PyObject *
-MedianQualityFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs) 
+static int
+MedianQualityFilter_passes(FastqFilter *self, PyObject **records,
+                           Py_ssize_t number_of_records)
 {
-    PyObject *record_tuple = GenericFilter_ParseArgsToRecordTuple(
-        args, kwargs, self->sequence_record_class);
-    if (record_tuple == NULL) {
-        return NULL;
-    }
-    Py_ssize_t record_tuple_length = PyTuple_GET_SIZE(record_tuple);
     uint8_t phred_offset = self->phred_offset;
     size_t total_phred_length = 0;
     int ret;
-    PyObject *record;
     size_t histogram[128];
     memset(histogram, 0, sizeof(size_t) * 128);
-    for (Py_ssize_t i=0; i < record_tuple_length; i++) {
-        record = PyTuple_GET_ITEM(record_tuple, i);
-        PyObject *phred_scores = PyObject_GetAttr(record, self->sequence_record_atrr);
+    for (Py_ssize_t i=0; i < number_of_records; i++) {
+        PyObject *phred_scores = FastqFilter_GetPhredScores(self, records[i]);
         if (phred_scores == NULL) {
-            return NULL;
-        }
-        if (phred_scores == Py_None) {
-            PyErr_Format(
-                PyExc_ValueError,
-                "SequenceRecord object with name %R does not have quality scores "
-                "(FASTA record)", PyObject_GetAttrString(record, "name")
-            );
-            Py_DECREF(phred_scores);
-            return NULL;
+            return -1;
         }
         uint8_t *phreds = PyUnicode_DATA(phred_scores);
         Py_ssize_t phred_length = PyUnicode_GetLength(phred_scores);
         ret = make_histogram(histogram, phreds, phred_length, phred_offset);
-        Py_DECREF(phred_scores);
         if (ret != 0) {
-            return NULL;
+            raise_phred_range_error(phreds, phred_length, phred_offset);
+            Py_DECREF(phred_scores);
+            return -1;
         }
+        Py_DECREF(phred_scores);
         total_phred_length += phred_length;
     }
     double median = median_from_histogram(histogram, total_phred_length, phred_offset);
     if (median < 0.0) {
-        return NULL;
+        return -1;
     }
-    self->total += 1;
-    int pass = median >= self->threshold_d;
-    if (pass) {
-        self->pass += 1;
-    }
-    return PyBool_FromLong(pass);
+    return median >= self->threshold_d;
 }
 
-
-static PyObject * 
-MinLengthFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs)
+static int
+MinLengthFilter_passes(FastqFilter *self, PyObject **records,
+                       Py_ssize_t number_of_records)
 {
-    PyObject *record_tuple = GenericFilter_ParseArgsToRecordTuple(
-        args, kwargs, self->sequence_record_class);
-    if (record_tuple == NULL) {
-        return NULL;
-    }
     PyObject *record;
-    Py_ssize_t record_tuple_length = PyTuple_GET_SIZE(record_tuple);
-    for (Py_ssize_t i=0; i < record_tuple_length; i++) {
-        record = PyTuple_GET_ITEM(record_tuple, i);
+    for (Py_ssize_t i=0; i < number_of_records; i++) {
+        record = records[i];
         Py_ssize_t length = PyObject_Length(record);
         if (length < 0) {
-            return NULL;
+            return -1;
         }
         // If any of the records passes the minimum length we pass.
         // R1 and R2 sequence the same molecule so this is valid.
         if (length >= self->threshold_i) {
-            self->pass += 1;
-            self->total += 1;
-            Py_RETURN_TRUE;
+            return 1;
         }
     }
-    self->total += 1;
-    Py_RETURN_FALSE;
+    return 0;
 }
 
-static PyObject *
-MaxLengthFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs) 
+static int
+MaxLengthFilter_passes(FastqFilter *self, PyObject **records,
+                       Py_ssize_t number_of_records)
 {
-    PyObject *record_tuple = GenericFilter_ParseArgsToRecordTuple(
-        args, kwargs, self->sequence_record_class);
-    if (record_tuple == NULL) {
-        return NULL;
-    }
     PyObject *record;
-    Py_ssize_t record_tuple_length = PyTuple_GET_SIZE(record_tuple);
-    for (Py_ssize_t i=0; i < record_tuple_length; i++) {
-        record = PyTuple_GET_ITEM(record_tuple, i);
+    for (Py_ssize_t i=0; i < number_of_records; i++) {
+        record = records[i];
         Py_ssize_t length = PyObject_Length(record);
         if (length < 0) {
-            return NULL;
+            return -1;
         }
         // If any of the records exceeds the maximum length we fail.
         // R1 and R2 sequence the same molecule so this is valid.
         if (length > self->threshold_i) {
-            self->total += 1;
-            Py_RETURN_FALSE;
+            return 0;
         }
     }
-    self->pass += 1;
+    return 1;
+}
+
+static inline PyObject *
+FastqFilter_Call(FastqFilter *self, PyObject *args, PyObject *kwargs,
+                 filter_function passes)
+{
+    PyObject **records;
+    Py_ssize_t number_of_records = GenericFilter_ParseArgsToRecords(
+        args, kwargs, self->sequence_record_class, &records);
+    if (number_of_records < 0) {
+        return NULL;
+    }
+    int pass = passes(self, records, number_of_records);
+    if (pass < 0) {
+        return NULL;
+    }
     self->total += 1;
-    Py_RETURN_TRUE;
+    if (pass) {
+        self->pass += 1;
+    }
+    return PyBool_FromLong(pass);
+}
+
+static PyObject *
+AverageErrorRateFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs)
+{
+    return FastqFilter_Call(self, args, kwargs, AverageErrorRateFilter_passes);
+}
+
+static PyObject *
+MedianQualityFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs)
+{
+    return FastqFilter_Call(self, args, kwargs, MedianQualityFilter_passes);
+}
+
+static PyObject *
+MinLengthFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs)
+{
+    return FastqFilter_Call(self, args, kwargs, MinLengthFilter_passes);
+}
+
+static PyObject *
+MaxLengthFilter__call__(FastqFilter *self, PyObject *args, PyObject *kwargs)
+{
+    return FastqFilter_Call(self, args, kwargs, MaxLengthFilter_passes);
 }
 
 static PyObject *
@@ -677,6 +932,157 @@ static PyTypeObject MaximumLengthFilter_Type = {
     .tp_getset = MaximumLengthFilter_properties,
 };
 
+static filter_function
+get_filter_function(PyObject *filter)
+{
+    PyTypeObject *filter_type = Py_TYPE(filter);
+    if (filter_type == &AverageErrorRateFilter_Type) {
+        return AverageErrorRateFilter_passes;
+    }
+    if (filter_type == &MedianQualityFilter_Type) {
+        return MedianQualityFilter_passes;
+    }
+    if (filter_type == &MinimumLengthFilter_Type) {
+        return MinLengthFilter_passes;
+    }
+    if (filter_type == &MaximumLengthFilter_Type) {
+        return MaxLengthFilter_passes;
+    }
+    return NULL;
+}
+
+typedef struct {
+    PyObject_HEAD
+    unsigned long long total;
+    unsigned long long pass;
+    PyTypeObject *sequence_record_class;
+    PyObject *filters;
+    filter_function *filter_functions;
+} CombinedFilter;
+
+static void
+CombinedFilter_dealloc(CombinedFilter *self)
+{
+    Py_CLEAR(self->sequence_record_class);
+    Py_CLEAR(self->filters);
+    PyMem_Free(self->filter_functions);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+CombinedFilter__new__(PyTypeObject *type, PyObject *args, PyObject *kwargs)
+{
+    PyObject *filters_arg = NULL;
+    static char *kwarg_names[] = {"filters", NULL};
+    static const char *format = "O|:";
+    if (!PyArg_ParseTupleAndKeywords(
+        args, kwargs, format, kwarg_names,
+        &filters_arg)) {
+            return NULL;
+    }
+    PyObject *filters = PySequence_Tuple(filters_arg);
+    if (filters == NULL) {
+        return NULL;
+    }
+    Py_ssize_t number_of_filters = PyTuple_GET_SIZE(filters);
+    filter_function *filter_functions = PyMem_Malloc(
+        sizeof(filter_function) * number_of_filters);
+    if (filter_functions == NULL) {
+        Py_DECREF(filters);
+        return PyErr_NoMemory();
+    }
+    for (Py_ssize_t i=0; i < number_of_filters; i++) {
+        PyObject *filter = PyTuple_GET_ITEM(filters, i);
+        filter_functions[i] = get_filter_function(filter);
+        if (filter_functions[i] == NULL) {
+            PyErr_Format(
+                PyExc_TypeError,
+                "Only AverageErrorRateFilter, MedianQualityFilter, "
+                "MinimumLengthFilter and MaximumLengthFilter objects can be "
+                "combined, got %s at index %zd",
+                Py_TYPE(filter)->tp_name, i);
+            PyMem_Free(filter_functions);
+            Py_DECREF(filters);
+            return NULL;
+        }
+    }
+    PyTypeObject *sequence_record_class = import_dnaio_sequence_record();
+    if (sequence_record_class == NULL) {
+        PyMem_Free(filter_functions);
+        Py_DECREF(filters);
+        return NULL;
+    }
+    CombinedFilter *self = PyObject_New(CombinedFilter, type);
+    self->total = 0;
+    self->pass = 0;
+    self->sequence_record_class = sequence_record_class;
+    self->filters = filters;
+    self->filter_functions = filter_functions;
+    return (PyObject *)self;
+}
+
+static PyObject *
+CombinedFilter__call__(CombinedFilter *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject **records;
+    Py_ssize_t number_of_records = GenericFilter_ParseArgsToRecords(
+        args, kwargs, self->sequence_record_class, &records);
+    if (number_of_records < 0) {
+        return NULL;
+    }
+    // The filters are called directly rather than through Python. The
+    // counters of the individual filters are updated so their statistics
+    // are the same as when they are applied one after another.
+    Py_ssize_t number_of_filters = PyTuple_GET_SIZE(self->filters);
+    for (Py_ssize_t i=0; i < number_of_filters; i++) {
+        FastqFilter *filter = (FastqFilter *)PyTuple_GET_ITEM(self->filters, i);
+        int pass = self->filter_functions[i](filter, records,
+                                             number_of_records);
+        if (pass < 0) {
+            return NULL;
+        }
+        filter->total += 1;
+        if (!pass) {
+            self->total += 1;
+            Py_RETURN_FALSE;
+        }
+        filter->pass += 1;
+    }
+    self->total += 1;
+    self->pass += 1;
+    Py_RETURN_TRUE;
+}
+
+static PyMemberDef CombinedFilterMembers[] = {
+    {"total", T_ULONGLONG, offsetof(CombinedFilter, total), READONLY,
+     "the total number of reads checked by this filter"},
+    {"passed", T_ULONGLONG, offsetof(CombinedFilter, pass), READONLY,
+     "the total number of reads to pass this filter"},
+    {"filters", T_OBJECT, offsetof(CombinedFilter, filters), READONLY,
+     "The filters that are applied, in order."},
+    {NULL}
+};
+
+static PyObject *
+CombinedFilter_get_name(PyObject *self, void *closure)
+{
+    return PyUnicode_FromString("combined");
+}
+
+static PyGetSetDef CombinedFilter_properties[] = {
+    {"name", CombinedFilter_get_name, NULL, NULL, NULL}, {NULL}};
+
+static PyTypeObject CombinedFilter_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "_filter.CombinedFilter",
+    .tp_basicsize = sizeof(CombinedFilter),
+    .tp_dealloc = (destructor)CombinedFilter_dealloc,
+    .tp_new = CombinedFilter__new__,
+    .tp_call = (ternaryfunc)CombinedFilter__call__,
+    .tp_members = CombinedFilterMembers,
+    .tp_getset = CombinedFilter_properties,
+};
+
 static struct PyModuleDef _filters_module = {
     PyModuleDef_HEAD_INIT,
     "_filters",   /* name of module */
@@ -705,6 +1111,7 @@ PyInit__filters(void)
     MODULE_ADD_TYPE(m, MedianQualityFilter, MedianQualityFilter_Type)
     MODULE_ADD_TYPE(m, MinimumLengthFilter, MinimumLengthFilter_Type)
     MODULE_ADD_TYPE(m, MaximumLengthFilter, MaximumLengthFilter_Type)
+    MODULE_ADD_TYPE(m, CombinedFilter, CombinedFilter_Type)
 
     PyModule_AddIntMacro(m, DEFAULT_PHRED_SCORE_OFFSET);
     return m;
@@ -1,7 +1,7 @@
 // An array holding all error rates for each phred score.
 // This file was automatically generated.
 
-static const double SCORE_TO_ERROR_RATE[128] = {
+static const double SCORE_TO_ERROR_RATE[256] = {
     1.0L,                     // 0
     0.7943282347242815L,      // 1
     0.6309573444801932L,      // 2
@@ -130,4 +130,132 @@ static const double SCORE_TO_ERROR_RATE[128] = {
     3.162277660168379E-13L,   // 125
     2.511886431509582E-13L,   // 126
     1.9952623149688827E-13L,  // 127
+    1.584893192461111E-13L,   // 128
+    1.2589254117941663E-13L,  // 129
+    1E-13L,                   // 130
+    7.943282347242822E-14L,   // 131
+    6.309573444801943E-14L,   // 132
+    5.0118723362727144E-14L,  // 133
+    3.9810717055349693E-14L,  // 134
+    3.1622776601683796E-14L,  // 135
+    2.5118864315095823E-14L,  // 136
+    1.9952623149688828E-14L,  // 137
+    1.584893192461111E-14L,   // 138
+    1.2589254117941662E-14L,  // 139
+    1E-14L,                   // 140
+    7.943282347242822E-15L,   // 141
+    6.309573444801943E-15L,   // 142
+    5.0118723362727146E-15L,  // 143
+    3.9810717055349695E-15L,  // 144
+    3.1622776601683794E-15L,  // 145
+    2.511886431509582E-15L,   // 146
+    1.995262314968883E-15L,   // 147
+    1.584893192461111E-15L,   // 148
+    1.2589254117941663E-15L,  // 149
+    1E-15L,                   // 150
+    7.943282347242821E-16L,   // 151
+    6.309573444801943E-16L,   // 152
+    5.011872336272715E-16L,   // 153
+    3.9810717055349695E-16L,  // 154
+    3.1622776601683793E-16L,  // 155
+    2.511886431509582E-16L,   // 156
+    1.995262314968883E-16L,   // 157
+    1.5848931924611109E-16L,  // 158
+    1.2589254117941662E-16L,  // 159
+    1E-16L,                   // 160
+    7.943282347242789E-17L,   // 161
+    6.309573444801943E-17L,   // 162
+    5.0118723362727144E-17L,  // 163
+    3.9810717055349855E-17L,  // 164
+    3.1622776601683796E-17L,  // 165
+    2.5118864315095718E-17L,  // 166
+    1.9952623149688827E-17L,  // 167
+    1.584893192461111E-17L,   // 168
+    1.2589254117941713E-17L,  // 169
+    1E-17L,                   // 170
+    7.94328234724279E-18L,    // 171
+    6.309573444801943E-18L,   // 172
+    5.011872336272715E-18L,   // 173
+    3.981071705534985E-18L,   // 174
+    3.1622776601683795E-18L,  // 175
+    2.5118864315095718E-18L,  // 176
+    1.995262314968883E-18L,   // 177
+    1.5848931924611109E-18L,  // 178
+    1.2589254117941713E-18L,  // 179
+    1E-18L,                   // 180
+    7.943282347242789E-19L,   // 181
+    6.309573444801943E-19L,   // 182
+    5.011872336272715E-19L,   // 183
+    3.9810717055349853E-19L,  // 184
+    3.162277660168379E-19L,   // 185
+    2.5118864315095717E-19L,  // 186
+    1.995262314968883E-19L,   // 187
+    1.584893192461111E-19L,   // 188
+    1.2589254117941713E-19L,  // 189
+    1E-19L,                   // 190
+    7.94328234724279E-20L,    // 191
+    6.309573444801943E-20L,   // 192
+    5.011872336272715E-20L,   // 193
+    3.9810717055349855E-20L,  // 194
+    3.162277660168379E-20L,   // 195
+    2.511886431509572E-20L,   // 196
+    1.9952623149688828E-20L,  // 197
+    1.5848931924611108E-20L,  // 198
+    1.2589254117941713E-20L,  // 199
+    1E-20L,                   // 200
+    7.943282347242789E-21L,   // 201
+    6.309573444801943E-21L,   // 202
+    5.011872336272714E-21L,   // 203
+    3.981071705534986E-21L,   // 204
+    3.1622776601683792E-21L,  // 205
+    2.511886431509572E-21L,   // 206
+    1.9952623149688827E-21L,  // 207
+    1.5848931924611108E-21L,  // 208
+    1.2589254117941713E-21L,  // 209
+    1E-21L,                   // 210
+    7.943282347242789E-22L,   // 211
+    6.309573444801943E-22L,   // 212
+    5.011872336272715E-22L,   // 213
+    3.9810717055349856E-22L,  // 214
+    3.1622776601683793E-22L,  // 215
+    2.511886431509572E-22L,   // 216
+    1.9952623149688828E-22L,  // 217
+    1.584893192461111E-22L,   // 218
+    1.2589254117941713E-22L,  // 219
+    1E-22L,                   // 220
+    7.943282347242789E-23L,   // 221
+    6.309573444801943E-23L,   // 222
+    5.011872336272715E-23L,   // 223
+    3.9810717055349854E-23L,  // 224
+    3.1622776601683793E-23L,  // 225
+    2.511886431509572E-23L,   // 226
+    1.995262314968883E-23L,   // 227
+    1.584893192461111E-23L,   // 228
+    1.2589254117941713E-23L,  // 229
+    1E-23L,                   // 230
+    7.943282347242789E-24L,   // 231
+    6.309573444801943E-24L,   // 232
+    5.011872336272715E-24L,   // 233
+    3.9810717055349856E-24L,  // 234
+    3.1622776601683795E-24L,  // 235
+    2.5118864315095718E-24L,  // 236
+    1.995262314968883E-24L,   // 237
+    1.5848931924611108E-24L,  // 238
+    1.2589254117941713E-24L,  // 239
+    1E-24L,                   // 240
+    7.943282347242789E-25L,   // 241
+    6.309573444801943E-25L,   // 242
+    5.011872336272715E-25L,   // 243
+    3.9810717055349854E-25L,  // 244
+    3.1622776601683796E-25L,  // 245
+    2.511886431509572E-25L,   // 246
+    1.995262314968883E-25L,   // 247
+    1.584893192461111E-25L,   // 248
+    1.2589254117941713E-25L,  // 249
+    1E-25L,                   // 250
+    7.943282347242789E-26L,   // 251
+    6.309573444801943E-26L,   // 252
+    5.0118723362727145E-26L,  // 253
+    3.9810717055349856E-26L,  // 254
+    3.162277660168379E-26L,   // 255
 };
@@ -18,24 +18,27 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import array
-import itertools
+import concurrent.futures
+import gzip
 import math
 import statistics
 import sys
-from typing import List
 
 from dnaio import Sequence
 
 import fastq_filter
-from fastq_filter import DEFAULT_PHRED_SCORE_OFFSET, qualmean, qualmedian
-
-import pytest  # type: ignore
+from fastq_filter import (
+    DEFAULT_PHRED_SCORE_OFFSET,
+    MedianQualityFilter,
+    MinimumLengthFilter,
+    average_error_rate,
+    qualmean,
+    qualmedian
+)
 
+from phred_helpers import OUTSIDE_RANGE_PHREDS, quallist_to_string
 
-def quallist_to_string(quallist: List[int]):
-    return array.array(
-        "B", [qual + DEFAULT_PHRED_SCORE_OFFSET for qual in quallist]
-    ).tobytes().decode("ascii")
+import pytest  # type: ignore
 
 
 QUAL_STRINGS = [
@@ -68,6 +71,49 @@ def test_qualmedian(qualstring):
     assert median_quality == qualmedian(qualstring)
 
 
+@pytest.mark.parametrize("length", [1023, 1024, 1025, 1026, 1027, 5000])
+def test_qualmedian_long(length):
+    # Long inputs are counted into multiple histograms.
+    quallist = [(i * 7) % 42 for i in range(length)]
+    assert qualmedian(quallist_to_string(quallist)) == \
+        statistics.median(quallist)
+
+
+@pytest.mark.parametrize("position", [0, 1, 2, 3, 1023, 1024, 1999])
+def test_qualmedian_long_outside_range(position):
+    quals = ["I"] * 2000
+    quals[position] = chr(127)
+    with pytest.raises(ValueError) as error:
+        qualmedian("".join(quals))
+    assert error.match("Character \x7f outside of valid phred range")
+
+
+def test_average_error_rate_precision():
+    # A single-precision accumulator loses the small error rates of the
+    # high quality scores once the sum is large compared to them.
+    number_of_scores = 10_000_000
+    qualities = (quallist_to_string([0]) +
+                 quallist_to_string([37]) * number_of_scores)
+    expected = (1 + number_of_scores * 10 ** -3.7) / (number_of_scores + 1)
+    assert average_error_rate(qualities) == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize("func", [qualmean, qualmedian, average_error_rate])
+@pytest.mark.parametrize("qualstring", QUAL_STRINGS)
+def test_bytes_like_phred_scores(func, qualstring):
+    qualbytes = qualstring.encode("ascii")
+    assert func(qualbytes) == func(qualstring)
+    assert func(bytearray(qualbytes)) == func(qualstring)
+    assert func(memoryview(qualbytes)) == func(qualstring)
+
+
+@pytest.mark.parametrize("func", [qualmean, qualmedian, average_error_rate])
+def test_multibyte_item_buffer_phred_scores(func):
+    with pytest.raises(TypeError) as error:
+        func(array.array("d", [40.0, 40.0]))
+    error.match("item size 8")
+
+
 def test_qualmedian_correct():
     # Make sure qualmedian also returns averages.
     qualities = "AACEGG"  # Median value should be D. ord("D") == 68
@@ -76,30 +122,59 @@ def test_qualmedian_correct():
     assert type(result) == float
 
 
-TOO_LOW_PHREDS = [chr(x) for x in range(33)]
-TOO_HIGH_PHREDS = [chr(127)]
-OUTSIDE_RANGE_PHREDS = TOO_LOW_PHREDS + TOO_HIGH_PHREDS
-NON_ASCII_PHREDS = [chr(x) for x in range(128, 256)]
+def test_qualmedian_maximum_score():
+    # The upper middle value is the highest possible score.
+    assert qualmedian(quallist_to_string([40, 93])) == 66.5
 
 
-@pytest.mark.parametrize(["func", "quals"],
-                         itertools.product([qualmean, qualmedian],
-                                           OUTSIDE_RANGE_PHREDS))
+NON_ASCII_PHREDS = list(bytes(range(128, 256)).decode("latin-1"))
+
+_OUTSIDE_RANGE_PARAMS = tuple((func, quals)
+                              for func in (qualmean, qualmedian)
+                              for quals in OUTSIDE_RANGE_PHREDS)
+_OUTSIDE_RANGE_IDS = [f"{func.__name__}-{ord(quals):02x}"
+                      for func, quals in _OUTSIDE_RANGE_PARAMS]
+_NON_ASCII_PARAMS = tuple((func, quals)
+                          for func in (qualmean, qualmedian)
+                          for quals in NON_ASCII_PHREDS)
+_NON_ASCII_IDS = [f"{func.__name__}-{ord(quals):02x}"
+                  for func, quals in _NON_ASCII_PARAMS]
+
+
+@pytest.mark.parametrize(["func", "quals"], _OUTSIDE_RANGE_PARAMS,
+                         ids=_OUTSIDE_RANGE_IDS)
 def test_outside_range_phreds(func, quals):
     with pytest.raises(ValueError) as error:
         func(quals)
     assert error.match("outside of valid phred range")
 
 
-@pytest.mark.parametrize(["func", "quals"],
-                         itertools.product([qualmean, qualmedian],
-                                           NON_ASCII_PHREDS))
+@pytest.mark.parametrize(["func", "quals"], _NON_ASCII_PARAMS,
+                         ids=_NON_ASCII_IDS)
 def test_non_ascii_phreds(func, quals):
     with pytest.raises(ValueError) as error:
         func(quals)
     assert error.match("phred_scores must be ASCII encoded.")
 
 
+@pytest.mark.parametrize("func", [qualmean, qualmedian, average_error_rate])
+def test_outside_range_phreds_long_input(func):
+    # Long inputs are processed without holding the GIL. The error should
+    # still be raised afterwards.
+    quals = "I" * 10_000 + "!" + chr(127)
+    with pytest.raises(ValueError) as error:
+        func(quals, phred_offset=34)
+    assert error.match("Character ! outside of valid phred range")
+
+
+@pytest.mark.parametrize("func", [qualmean, qualmedian, average_error_rate])
+def test_long_input_threads(func):
+    quals = [quallist_to_string([i % 42] * 100_000) for i in range(16)]
+    expected = [func(qual) for qual in quals]
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        assert list(executor.map(func, quals)) == expected
+
+
 def test_fastq_records_to_file(tmp_path):
     records = [Sequence("TEST", "A", "A")] * 3
     out = tmp_path / "test.fq"
@@ -109,6 +184,15 @@ def test_fastq_records_to_file(tmp_path):
                                b"@TEST\nA\n+\nA\n"
 
 
+def test_fastq_records_to_file_multiple_batches(tmp_path):
+    records = [Sequence(f"read{i}", "ACGT" * 25, "I" * 100)
+               for i in range(fastq_filter.WRITE_BATCH_SIZE * 2 + 1)]
+    out = tmp_path / "test.fq"
+    fastq_filter.fastq_records_to_file(records, str(out))
+    assert out.read_bytes() == b"".join(
+        record.fastq_bytes() for record in records)
+
+
 def test_file_to_fastq_records(tmp_path):
     out = tmp_path / "test.fq"
     out.write_bytes(b"@TEST\nA\n+\nA\n@TEST\nA\n+\nA\n@TEST\nA\n+\nA\n")
@@ -125,6 +209,57 @@ def test_main(tmp_path):
     assert out_f.read_bytes() == b"@TEST\nAA\n+\nAA\n"
 
 
+@pytest.mark.parametrize("threads", ["0", "1"])
+def test_main_threads(tmp_path, threads):
+    in_f = tmp_path / "in.fq.gz"
+    out_f = tmp_path / "out.fq.gz"
+    with gzip.open(in_f, "wb") as in_h:
+        in_h.write(b"@TEST\nAA\n+\nAA\n@TEST\nA\n+\nA\n")
+    sys.argv = ["", "-l", "2", "-t", threads, str(in_f), "-o", str(out_f)]
+    fastq_filter.main()
+    with gzip.open(out_f, "rb") as out_h:
+        assert out_h.read() == b"@TEST\nAA\n+\nAA\n"
+
+
+def test_filter_fastq_applies_cheap_filters_first(tmp_path):
+    in_f = tmp_path / "in.fq"
+    out_f = tmp_path / "out.fq"
+    in_f.write_bytes(b"@TEST\nAA\n+\nAA\n@TEST\nA\n+\nA\n@TEST\nA\n+\nA\n")
+    quality_filter = MedianQualityFilter(20)
+    length_filter = MinimumLengthFilter(2)
+    fastq_filter.filter_fastq([str(in_f)], [str(out_f)],
+                              [quality_filter, length_filter])
+    assert out_f.read_bytes() == b"@TEST\nAA\n+\nAA\n"
+    assert length_filter.total == 3
+    assert length_filter.passed == 1
+    # Only the record that passed the length filter is checked for quality.
+    assert quality_filter.total == 1
+    assert quality_filter.passed == 1
+
+
+@pytest.mark.parametrize("number_of_files", [1, 2, 3, 4])
+def test_filter_fastq_write_batches(tmp_path, number_of_files):
+    # Use more records than fit in one write batch, so the remainder must
+    # be written as well.
+    number_of_records = fastq_filter.WRITE_BATCH_SIZE * 3 + 3
+    records = [Sequence(f"read{i}", "A" * (i % 3), "I" * (i % 3))
+               for i in range(number_of_records)]
+    input_files = []
+    output_files = []
+    for n in range(number_of_files):
+        input_file = tmp_path / f"in{n}.fq"
+        fastq_filter.fastq_records_to_file(records, str(input_file))
+        input_files.append(str(input_file))
+        output_files.append(str(tmp_path / f"out{n}.fq"))
+    fastq_filter.filter_fastq(input_files, output_files,
+                              [MinimumLengthFilter(2)])
+    expected = b"".join(record.fastq_bytes() for record in records
+                        if len(record) >= 2)
+    for output_file in output_files:
+        with open(output_file, "rb") as output_h:
+            assert output_h.read() == expected
+
+
 @pytest.mark.parametrize("func", [qualmean, qualmedian])
 def test_empty_quals_returns_nan(func):
     assert math.isnan(func(""))
@@ -17,27 +17,32 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-import array
-import itertools
-from typing import List
+import functools
 
 from dnaio import SequenceRecord
 
 from fastq_filter import (
     AverageErrorRateFilter,
-    DEFAULT_PHRED_SCORE_OFFSET,
+    CombinedFilter,
     MaximumLengthFilter,
     MedianQualityFilter,
-    MinimumLengthFilter
+    MinimumLengthFilter,
+    average_error_rate,
 )
 
+from phred_helpers import OUTSIDE_RANGE_PHREDS, quallist_to_string
+
 import pytest
 
 
-def quallist_to_string(quallist: List[int]):
-    return array.array(
-        "B", [qual + DEFAULT_PHRED_SCORE_OFFSET for qual in quallist]
-    ).tobytes().decode("ascii")
+@functools.lru_cache(maxsize=None)
+def _make_record(qualities: str) -> SequenceRecord:
+    return SequenceRecord("name", "A" * len(qualities), qualities)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_length_record(length: int) -> SequenceRecord:
+    return SequenceRecord("name", "A" * length, "H" * length)
 
 
 # def test_average_error_rate_filter_new():
@@ -61,21 +66,41 @@ def quallist_to_string(quallist: List[int]):
 #     assert filter.threshold == 20
 
 
-@pytest.mark.parametrize(
-    ["threshold", "qualities", "result"], (
-        (0.001, [chr(63)], True),
-        (0.001, [chr(64)], True),
-        (0.001, [chr(62)], False),
-        (10 ** -(10 / 10), [quallist_to_string([9, 9, 9])], False),
-        (10 ** -(8 / 10), [quallist_to_string([9, 9, 9])], True),
-        (10 ** -(8 / 10), [quallist_to_string([8, 8, 8]),
-                           quallist_to_string([8, 7, 8])], False),
-    ))
-def test_average_error_rate_filter(threshold, qualities, result):
+_AVG_CASES = (
+    (0.001, ["?"], True),
+    (0.001, ["@"], True),
+    (0.001, [">"], False),
+    (10 ** -(10 / 10), [quallist_to_string([9, 9, 9])], False),
+    (10 ** -(8 / 10), [quallist_to_string([9, 9, 9])], True),
+    (10 ** -(8 / 10), [quallist_to_string([8, 8, 8]),
+                       quallist_to_string([8, 7, 8])], False),
+)
+
+_MEDIAN_CASES = (
+    (30, ["?"], True),
+    (30, ["@"], True),
+    (30, [">"], False),
+    (10, [quallist_to_string([9, 9, 9, 10, 10])], False),
+    (8, [quallist_to_string([9, 9, 9])], True),
+    (8, [quallist_to_string([1, 1, 1, 8, 9, 9, 9])], True),
+    (8, [quallist_to_string([1, 1, 1, 8, 9, 9, 9]),
+         quallist_to_string([1, 1, 1, 7, 9, 9, 9])], False),
+    (8, [quallist_to_string([1, 1, 1, 8, 9, 9, 9]),
+         quallist_to_string([1, 1, 1, 8, 9, 9, 9])], True)
+)
+
+
+@pytest.fixture
+def records(request):
+    """Records built from the indirectly parametrized quality strings."""
+    return tuple(_make_record(qual) for qual in request.param)
+
+
+@pytest.mark.parametrize(["threshold", "records", "result"], _AVG_CASES,
+                         indirect=["records"])
+def test_average_error_rate_filter(threshold, records, result):
     filter = AverageErrorRateFilter(threshold)
-    records = [SequenceRecord("name", len(qual) * 'A', qual)
-               for qual in qualities]
-    assert filter(tuple(records)) is result
+    assert filter(records) is result
     # assert filter.total == 1
     # if result:
     #     assert filter.passed == 1
@@ -83,24 +108,11 @@ def test_average_error_rate_filter(threshold, qualities, result):
     #     assert filter.passed == 0
 
 
-@pytest.mark.parametrize(
-    ["threshold", "qualities", "result"], (
-        (30, [chr(63)], True),
-        (30, [chr(64)], True),
-        (30, [chr(62)], False),
-        (10, [quallist_to_string([9, 9, 9, 10, 10])], False),
-        (8, [quallist_to_string([9, 9, 9])], True),
-        (8, [quallist_to_string([1, 1, 1, 8, 9, 9, 9])], True),
-        (8, [quallist_to_string([1, 1, 1, 8, 9, 9, 9]),
-             quallist_to_string([1, 1, 1, 7, 9, 9, 9])], False),
-        (8, [quallist_to_string([1, 1, 1, 8, 9, 9, 9]),
-             quallist_to_string([1, 1, 1, 8, 9, 9, 9])], True)
-    ))
-def test_median_quality_filter(threshold, qualities, result):
+@pytest.mark.parametrize(["threshold", "records", "result"], _MEDIAN_CASES,
+                         indirect=["records"])
+def test_median_quality_filter(threshold, records, result):
     filter = MedianQualityFilter(threshold)
-    records = [SequenceRecord("name", len(qual) * 'A', qual)
-               for qual in qualities]
-    assert filter(tuple(records)) is result
+    assert filter(records) is result
     # assert filter.total == 1
     # if result:
     #     assert filter.passed == 1
@@ -108,37 +120,105 @@ def test_median_quality_filter(threshold, qualities, result):
     #     assert filter.passed == 0
 
 
-TOO_LOW_PHREDS = [chr(x) for x in range(33)]
-TOO_HIGH_PHREDS = [chr(127)]
-OUTSIDE_RANGE_PHREDS = TOO_LOW_PHREDS + TOO_HIGH_PHREDS
+@pytest.mark.parametrize(["filter_class", "cases"], [
+    (AverageErrorRateFilter, _AVG_CASES),
+    (MedianQualityFilter, _MEDIAN_CASES),
+])
+def test_quality_filter_batched(filter_class, cases):
+    # Run all cases through one filter per threshold so the counters
+    # are checked over multiple calls.
+    filters = {}
+    expected_counts = {}
+    for threshold, qualities, result in cases:
+        if threshold not in filters:
+            filters[threshold] = filter_class(threshold)
+            expected_counts[threshold] = [0, 0]
+        records = tuple(_make_record(qual) for qual in qualities)
+        assert filters[threshold](records) is result
+        expected_counts[threshold][0] += 1
+        expected_counts[threshold][1] += int(result)
+    for threshold, filter in filters.items():
+        assert [filter.total, filter.passed] == expected_counts[threshold]
 
 
-@pytest.mark.parametrize(
-    ["filter_class", "quals"],
-    itertools.product(
-        [AverageErrorRateFilter, MedianQualityFilter], OUTSIDE_RANGE_PHREDS)
-)
-def test_outside_range(filter_class, quals):
-    record = SequenceRecord("name", "A", quals)
+@pytest.mark.parametrize("filter_class",
+                         [AverageErrorRateFilter, MedianQualityFilter])
+def test_outside_range(filter_class):
     filter = filter_class(1)
+    for quals in OUTSIDE_RANGE_PHREDS:
+        with pytest.raises(ValueError,
+                           match="outside of valid phred range"):
+            filter((_make_record(quals),))
+
+
+@pytest.mark.parametrize("number_of_records", [1, 2, 3])
+def test_average_error_rate_filter_early_exit_validates(number_of_records):
+    # The records fail within the first block of phred scores, the invalid
+    # character at the end must still be detected.
+    qualities = ["!" * 600 + "I" * 600] * number_of_records
+    valid_records = tuple(_make_record(qual) for qual in qualities)
+    assert not AverageErrorRateFilter(0.001)(valid_records)
+    qualities[-1] = "!" * 600 + "I" * 599 + chr(127)
+    records = tuple(_make_record(qual) for qual in qualities)
     with pytest.raises(ValueError) as error:
-        filter((record,))
+        AverageErrorRateFilter(0.001)(records)
     error.match("outside of valid phred range")
 
 
-@pytest.mark.parametrize(
-    ["threshold", "lengths", "result"], (
-        (10, [10], True),
-        (11, [10], True),
-        (10, [11], False),
-        (10, [11, 10], False),
-        (10, [10, 9], True)
-    ))
+@pytest.mark.parametrize("bad_position", [0, 255, 256, 511, 512, 1021, 1022])
+def test_average_error_rate_filter_long_records(bad_position):
+    # Check results across block boundaries against the reference
+    # implementation.
+    quals = ["I"] * 1023
+    quals[bad_position] = "!"
+    qual = "".join(quals)
+    record = SequenceRecord("name", len(qual) * "A", qual)
+    error_rate = average_error_rate(qual)
+    assert AverageErrorRateFilter(error_rate * 1.000001)(record)
+    assert not AverageErrorRateFilter(error_rate * 0.999999)(record)
+    record2 = SequenceRecord("name", "A" * 100, "I" * 100)
+    paired_error_rate = average_error_rate(qual + "I" * 100)
+    filter = AverageErrorRateFilter(paired_error_rate * 0.999999)
+    assert not filter((record, record2))
+    assert not filter((record2, record))
+    filter = AverageErrorRateFilter(paired_error_rate * 1.000001)
+    assert filter((record, record2))
+    assert filter((record2, record))
+
+
+_LENGTH_MAX_CASES = (
+    (10, [10], True),
+    (11, [10], True),
+    (10, [11], False),
+    (10, [11, 10], False),
+    (10, [10, 9], True)
+)
+
+_LENGTH_MIN_CASES = (
+    (10, [10], True),
+    (11, [10], False),
+    (10, [11], True),
+    (10, [11, 10], True),
+    (10, [10, 9], True),
+    (10, [10, 8, 8], True),
+    (10, [9, 9], False)
+)
+
+_COMBINED_CASES = (
+    ([10], ["I" * 10], True),
+    ([9], ["I" * 9], False),
+    ([10], ["#" * 10], False),
+    ([10, 12], ["I" * 10, "#" * 12], False),
+    ([10, 12], ["I" * 10, "I" * 12], True),
+)
+
+
+@pytest.mark.parametrize(["threshold", "lengths", "result"],
+                         _LENGTH_MAX_CASES)
 def test_maximum_length_filter(threshold, lengths, result):
     filter = MaximumLengthFilter(threshold)
-    records = [SequenceRecord("name", length * 'A', length * 'H')
-               for length in lengths]
-    assert filter(tuple(records)) is result
+    records = tuple(_make_length_record(length) for length in lengths)
+    assert filter(records) is result
     # assert filter.total == 1
     # if result:
     #     assert filter.passed == 1
@@ -146,23 +226,64 @@ def test_maximum_length_filter(threshold, lengths, result):
     #     assert filter.passed == 0
 
 
-@pytest.mark.parametrize(
-    ["threshold", "lengths", "result"], (
-        (10, [10], True),
-        (11, [10], False),
-        (10, [11], True),
-        (10, [11, 10], True),
-        (10, [10, 9], True),
-        (10, [10, 8, 8], True),
-        (10, [9, 9], False)
-    ))
+@pytest.mark.parametrize(["threshold", "lengths", "result"],
+                         _LENGTH_MIN_CASES)
 def test_minimum_length_filter(threshold, lengths, result):
     filter = MinimumLengthFilter(threshold)
-    records = [SequenceRecord("name", length * 'A', length * 'H')
-               for length in lengths]
-    assert filter(tuple(records)) is result
+    records = tuple(_make_length_record(length) for length in lengths)
+    assert filter(records) is result
     # assert filter.total == 1
     # if result:
     #     assert filter.passed == 1
     # else:
     #     assert filter.passed == 0
+
+
+@pytest.mark.parametrize(["lengths", "qualities", "result"],
+                         _COMBINED_CASES)
+def test_combined_filter(lengths, qualities, result):
+    filters = [MinimumLengthFilter(10), AverageErrorRateFilter(0.001)]
+    combined = CombinedFilter(filters)
+    records = [SequenceRecord("name", length * 'A', qual)
+               for length, qual in zip(lengths, qualities)]
+    assert combined(tuple(records)) is result
+    assert combined.total == 1
+    assert combined.passed == int(result)
+    assert combined.filters == tuple(filters)
+
+
+def test_combined_filter_counts_individual_filters():
+    min_length = MinimumLengthFilter(10)
+    average_error_rate = AverageErrorRateFilter(0.001)
+    combined = CombinedFilter([min_length, average_error_rate])
+    for length, qual in ((9, "I"), (10, "#"), (10, "I")):
+        combined((SequenceRecord("name", length * 'A', length * qual),))
+    assert (min_length.total, min_length.passed) == (3, 2)
+    assert (average_error_rate.total, average_error_rate.passed) == (2, 1)
+    assert (combined.total, combined.passed) == (3, 1)
+
+
+def test_combined_filter_wrong_type():
+    with pytest.raises(TypeError) as error:
+        CombinedFilter([MinimumLengthFilter(10), len])
+    error.match("builtin_function_or_method at index 1")
+
+
+@pytest.mark.parametrize("filter", [
+    AverageErrorRateFilter(0.001),
+    MedianQualityFilter(30),
+    MinimumLengthFilter(10),
+    MaximumLengthFilter(10),
+    CombinedFilter([MinimumLengthFilter(10), AverageErrorRateFilter(0.001)])
+])
+@pytest.mark.parametrize("length", [9, 10, 11])
+@pytest.mark.parametrize("qual", ["I", "#"])
+def test_filter_single_record(filter, length, qual):
+    record = SequenceRecord("name", length * 'A', length * qual)
+    assert filter(record) is filter((record,))
+
+
+def test_filter_wrong_argument_type():
+    with pytest.raises(TypeError) as error:
+        MinimumLengthFilter(10)("AAAA")
+    error.match("must be a tuple or a dnaio.SequenceRecord, got str")